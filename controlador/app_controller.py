@@ -156,6 +156,34 @@ class InventoryApp(MDApp):
             print("✗ ANDROID: Permiso de cámara DENEGADO")
             # TODO Fase 2: Mostrar dialog explicando por qué se necesita
     
+    # ─────────────────────────────────────────────────────────
+    # CICLO DE VIDA
+    # ─────────────────────────────────────────────────────────
+
+    def on_pause(self):
+        """
+        Android pausa la app (detiene el Clock y puede matar el proceso).
+        Los movimientos aún en memoria se escriben antes de pausar.
+        """
+        self._vaciar_movimientos_pendientes()
+        return True
+
+    def on_stop(self):
+        """Al cerrar la app, escribir los movimientos aún en memoria."""
+        self._vaciar_movimientos_pendientes()
+
+    def _vaciar_movimientos_pendientes(self):
+        """Envía al repositorio los movimientos encolados en CameraScreen."""
+        root = self.root
+        if root is None or not hasattr(root, "has_screen") or not root.has_screen("main"):
+            return
+        try:
+            screen_manager = root.get_screen("main").ids.screen_manager
+            if screen_manager.has_screen("camera"):
+                screen_manager.get_screen("camera")._flush_movs()
+        except Exception as e:
+            print(f"⚠ Error vaciando movimientos pendientes: {e}")
+
     # ─────────────────────────────────────────────────────────
     # NAVEGACIÓN
     # ─────────────────────────────────────────────────────────
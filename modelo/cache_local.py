@@ -12,6 +12,23 @@ from typing import Optional, List, Dict, Any
 
 from kivy.utils import platform
 
+# Filas por executemany/commit al sincronizar desde Firebase
+SYNC_LOTE = 50
+
+# Campos de producto con columna propia; el resto va a datos_extra (JSON)
+_DATOS_CONOCIDOS = frozenset((
+    'codigo_barras', 'nombre', 'categoria', 'cantidad', 'unidad', 'ubicacion',
+    'precio_unitario', 'imagen_url', 'fecha_vencimiento', 'stock_minimo', 'stock_maximo',
+))
+
+_SQL_GUARDAR_PRODUCTO = '''
+    INSERT OR REPLACE INTO productos
+    (codigo_barras, nombre, categoria, cantidad, unidad, ubicacion,
+     precio_unitario, imagen_url, fecha_vencimiento, stock_minimo, stock_maximo,
+     fecha_sync, datos_extra)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
 
 class CacheLocal:
     """
@@ -208,35 +225,8 @@ class CacheLocal:
         """
         try:
             cursor = self.conn.cursor()
-
-            # Extraer datos extra que no tienen columna
-            datos_conocidos = ['codigo_barras', 'nombre', 'categoria',
-                             'cantidad', 'unidad', 'ubicacion', 'precio_unitario',
-                             'imagen_url', 'fecha_vencimiento', 'stock_minimo', 'stock_maximo']
-            datos_extra = {k: v for k, v in producto.items() if k not in datos_conocidos}
-
-            cursor.execute('''
-                INSERT OR REPLACE INTO productos
-                (codigo_barras, nombre, categoria, cantidad, unidad, ubicacion,
-                 precio_unitario, imagen_url, fecha_vencimiento, stock_minimo, stock_maximo,
-                 fecha_sync, datos_extra)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                producto.get('codigo_barras'),
-                producto.get('nombre', ''),
-                producto.get('categoria', ''),
-                producto.get('cantidad', 0),
-                producto.get('unidad', 'unidades'),
-                producto.get('ubicacion', ''),
-                producto.get('precio_unitario'),
-                producto.get('imagen_url', ''),
-                producto.get('fecha_vencimiento', ''),
-                producto.get('stock_minimo', 0),
-                producto.get('stock_maximo', 0),
-                datetime.now().isoformat(),
-                json.dumps(datos_extra) if datos_extra else None
-            ))
-
+            cursor.execute(_SQL_GUARDAR_PRODUCTO,
+                           self._producto_a_fila(producto, datetime.now().isoformat()))
             self.conn.commit()
             return True
 
@@ -244,6 +234,26 @@ class CacheLocal:
             print(f"✗ Error guardando en cache: {e}")
             return False
 
+    def _producto_a_fila(self, producto: Dict[str, Any], fecha_sync: str) -> tuple:
+        """Convierte producto a la tupla de parámetros de _SQL_GUARDAR_PRODUCTO."""
+        # Extraer datos extra que no tienen columna
+        datos_extra = {k: v for k, v in producto.items() if k not in _DATOS_CONOCIDOS}
+        return (
+            producto.get('codigo_barras'),
+            producto.get('nombre', ''),
+            producto.get('categoria', ''),
+            producto.get('cantidad', 0),
+            producto.get('unidad', 'unidades'),
+            producto.get('ubicacion', ''),
+            producto.get('precio_unitario'),
+            producto.get('imagen_url', ''),
+            producto.get('fecha_vencimiento', ''),
+            producto.get('stock_minimo', 0),
+            producto.get('stock_maximo', 0),
+            fecha_sync,
+            json.dumps(datos_extra) if datos_extra else None
+        )
+
     def actualizar_cantidad(self, codigo_barras: str, cantidad: int) -> bool:
         """Actualiza solo la cantidad de un producto."""
         try:
@@ -278,6 +288,7 @@ class CacheLocal:
     def sincronizar_desde_firebase(self, productos: List[Dict[str, Any]]) -> int:
         """
         Actualiza cache con datos de Firebase.
+        Escribe en lotes de SYNC_LOTE filas (un executemany y un commit por lote).
 
         Args:
             productos: Lista de productos desde Firebase
@@ -286,10 +297,14 @@ class CacheLocal:
             int: Cantidad de productos sincronizados
         """
         try:
+            cursor = self.conn.cursor()
+            fecha_sync = datetime.now().isoformat()
             count = 0
-            for producto in productos:
-                if self.guardar_producto(producto):
-                    count += 1
+            for i in range(0, len(productos), SYNC_LOTE):
+                filas = [self._producto_a_fila(p, fecha_sync) for p in productos[i:i + SYNC_LOTE]]
+                cursor.executemany(_SQL_GUARDAR_PRODUCTO, filas)
+                self.conn.commit()
+                count += len(filas)
 
             print(f"✓ Cache sincronizado: {count} productos")
             return count
@@ -333,7 +333,8 @@ class FirebaseClient:
         """Convierte documento Firestore a dict Python."""
         try:
             fields = doc.get('fields', {})
-            result = {'codigo_barras': doc_id}
+            # 'cantidad' siempre presente: permite ordenar con itemgetter sin .get
+            result = {'codigo_barras': doc_id, 'cantidad': 0}
 
             for key, value in fields.items():
                 result[key] = self._parse_firestore_value(value)
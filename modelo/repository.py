@@ -4,7 +4,9 @@ Repository Pattern para SIAM.
 Orquesta las operaciones entre Firebase (remoto) y SQLite (cache local).
 """
 
-from typing import Optional, List, Dict, Any, Callable
+import json
+import time
+from typing import Optional, List, Dict, Any, Callable, Tuple
 from kivy.clock import Clock
 
 from modelo.firebase_client import FirebaseClient, FIREBASE_AVAILABLE
@@ -22,6 +24,9 @@ class ProductoRepository:
 
     _instance = None
 
+    # Segundos durante los que un sync con Firebase se considera vigente
+    SYNC_TTL = 30
+
     def __new__(cls):
         """Singleton."""
         if cls._instance is None:
@@ -37,6 +42,9 @@ class ProductoRepository:
         self.firebase = FirebaseClient() if FIREBASE_AVAILABLE else None
         self.is_online = False
         self._sync_in_progress = False
+        self.last_sync_ts = 0.0  # time.monotonic() del último sync completo con Firebase
+        self._versiones = {}     # codigo_barras -> huella del producto en el último sync
+        self.version = 0         # Se incrementa con cada escritura al cache (invalida vistas)
 
     def conectar(self, config_path: str = "firebase-config.json") -> bool:
         """
@@ -55,22 +63,53 @@ class ProductoRepository:
                 Clock.schedule_once(lambda dt: self._sync_inicial(), 1)
         return True  # Cache siempre disponible
 
-    def _sync_inicial(self):
+    def _sync_inicial(self, forzar: bool = False):
         """Sincroniza cache con Firebase al iniciar."""
         if self._sync_in_progress or not self.is_online:
             return
+        if not forzar and self.sync_reciente():
+            return
 
         self._sync_in_progress = True
         try:
             productos = self.firebase.get_todos_productos_sync()
             if productos:
-                self.cache.sincronizar_desde_firebase(productos)
+                self.guardar_sync(productos)
                 print(f"✓ Sync inicial: {len(productos)} productos")
         except Exception as e:
             print(f"✗ Error en sync inicial: {e}")
         finally:
             self._sync_in_progress = False
 
+    def guardar_sync(self, productos: List[Dict[str, Any]]) -> int:
+        """
+        Vuelca al cache los productos descargados de Firebase y registra la hora del sync.
+        Solo escribe los productos que cambiaron desde el sync anterior (delta).
+
+        Returns:
+            int: Cantidad de productos escritos en cache
+        """
+        cambiados = []
+        versiones = {}
+        for producto in productos:
+            codigo = producto.get('codigo_barras')
+            huella = json.dumps(producto, sort_keys=True, default=str)
+            versiones[codigo] = huella
+            if self._versiones.get(codigo) != huella:
+                cambiados.append(producto)
+
+        total = self.cache.sincronizar_desde_firebase(cambiados) if cambiados else 0
+        if total:
+            self.version += 1
+        if total == len(cambiados):
+            self._versiones = versiones  # Si la escritura falló, el próximo sync reintenta
+        self.last_sync_ts = time.monotonic()
+        return total
+
+    def sync_reciente(self) -> bool:
+        """True si el último sync con Firebase tiene menos de SYNC_TTL segundos."""
+        return self.last_sync_ts > 0 and time.monotonic() - self.last_sync_ts < self.SYNC_TTL
+
     # ─────────────────────────────────────────────────────────
     # LECTURA
     # ─────────────────────────────────────────────────────────
@@ -182,6 +221,49 @@ class ProductoRepository:
             codigo_barras, "salida", cantidad, usuario, notas, callback
         )
 
+    def registrar_movimientos_batch(
+        self,
+        movimientos: List[Tuple[str, str, int, str]],
+        callback: Callable = None
+    ) -> int:
+        """
+        Registra un lote de movimientos, agrupando los consecutivos del mismo producto,
+        tipo y usuario en una sola operación (una escritura en cache/Firebase por grupo).
+
+        Solo se juntan movimientos consecutivos: sumar todas las entradas y todas las
+        salidas de un código cambiaría el orden y podría rechazar secuencias válidas
+        (stock 3: salida 3 → entrada 5 → salida 4 no equivale a "salida 7").
+
+        Args:
+            movimientos: Lista de (codigo_barras, tipo, cantidad, usuario)
+            callback: Función llamada por grupo con (ok, mensaje, codigo_barras, tipo, cantidad)
+
+        Returns:
+            int: Cantidad de grupos registrados
+        """
+        agrupados: List[List[Any]] = []  # [codigo_barras, tipo, usuario, cantidad] en orden
+        ultimo: Dict[str, List[Any]] = {}  # codigo_barras -> su último grupo
+        for codigo_barras, tipo, cantidad, usuario in movimientos:
+            grupo = ultimo.get(codigo_barras)
+            if grupo is not None and grupo[1] == tipo and grupo[2] == usuario:
+                grupo[3] += cantidad
+            else:
+                grupo = [codigo_barras, tipo, usuario, cantidad]
+                agrupados.append(grupo)
+                ultimo[codigo_barras] = grupo
+
+        registrados = 0
+        for codigo_barras, tipo, usuario, cantidad in agrupados:
+            grupo_callback = None
+            if callback:
+                grupo_callback = (
+                    lambda ok, msg, c=codigo_barras, t=tipo, n=cantidad: callback(ok, msg, c, t, n)
+                )
+            if self._registrar_movimiento(codigo_barras, tipo, cantidad, usuario, "", grupo_callback):
+                registrados += 1
+
+        return registrados
+
     def _registrar_movimiento(
         self,
         codigo_barras: str,
@@ -235,6 +317,8 @@ class ProductoRepository:
 
         # 3. Actualizar en cache (inmediato)
         self.cache.actualizar_cantidad(codigo_barras, nueva_cantidad)
+        self.version += 1
+        self._versiones.pop(codigo_barras, None)  # El próximo sync debe reescribirlo
 
         # 4. Sincronizar con Firebase
         if self.is_online and self.firebase:
@@ -285,6 +369,8 @@ class ProductoRepository:
 
         # Guardar en cache
         self.cache.guardar_producto(producto)
+        self.version += 1
+        self._versiones.pop(producto['codigo_barras'], None)  # El próximo sync debe reescribirlo
 
         # Sincronizar con Firebase
         if self.is_online and self.firebase:
@@ -324,7 +410,7 @@ class ProductoRepository:
                 print(f"✗ Error procesando cola: {e}")
 
         # 2. Descargar productos actualizados
-        self._sync_inicial()
+        self._sync_inicial(forzar=True)
 
         if callback:
             callback(True, "Sincronización completada")
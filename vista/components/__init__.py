@@ -4,5 +4,6 @@ Componentes reutilizables de la UI.
 """
 
 from vista.components.form_bottom_sheet import FormBottomSheet
+from vista.components.notificador import Notificador
 
-__all__ = ['FormBottomSheet']
+__all__ = ['FormBottomSheet', 'Notificador']
@@ -0,0 +1,87 @@
+# vista/components/notificador.py
+"""
+Snackbar compartido para mensajes breves.
+Una sola instancia de MDSnackbar para toda la app, reutilizada en cada mensaje.
+"""
+
+from kivy.clock import Clock
+from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
+
+
+class Notificador:
+    """
+    Muestra mensajes en un MDSnackbar único (Singleton).
+
+    Si el snackbar ya está visible solo cambia el texto y reinicia el tiempo
+    de cierre, en vez de construir y animar un snackbar nuevo por mensaje.
+
+    El cierre lo decide _cerrar_trigger. MDSnackbar cierra solo tras `duration`
+    segundos desde que se abrió (auto_dismiss no lo desactiva), así que se le da
+    una duración muy larga y se reinicia su contador interno en cada mensaje.
+    Visible = el snackbar tiene parent; _cerrando cubre la animación de salida.
+
+    Uso:
+        Notificador().mostrar("Producto registrado")
+    """
+
+    _instance = None
+
+    # Segundos visible después del último mensaje
+    DURACION = 3
+    # Duración interna de MDSnackbar: nunca debe alcanzarse
+    DURACION_INTERNA = 3600
+
+    def __new__(cls):
+        """Singleton."""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if hasattr(self, '_initialized'):
+            return
+
+        self._initialized = True
+        self._snackbar = None  # Se construye en el primer mensaje
+        self._texto = None
+        self._cerrando = False  # dismiss() en curso (animación de salida)
+        self._reabrir = False  # Mensaje llegado durante la animación de cierre
+        self._cerrar_trigger = Clock.create_trigger(self._cerrar, self.DURACION)
+
+    def mostrar(self, mensaje: str):
+        """Muestra mensaje (reutiliza el snackbar si ya está abierto)."""
+        if self._snackbar is None:
+            self._texto = MDSnackbarText(text=mensaje)
+            self._snackbar = MDSnackbar(
+                self._texto,
+                y="24dp",
+                pos_hint={"center_x": 0.5},
+                size_hint_x=0.9,
+                duration=self.DURACION_INTERNA,  # El cierre lo maneja _cerrar_trigger
+            )
+            self._snackbar.bind(parent=self._on_parent)
+
+        self._texto.text = mensaje
+        self._snackbar._interval = 0  # Reinicia el temporizador interno de MDSnackbar
+        if self._snackbar.parent is None:
+            self._snackbar.open()
+        elif self._cerrando:
+            self._reabrir = True  # Se reabre cuando termine de cerrarse
+
+        self._cerrar_trigger.cancel()
+        self._cerrar_trigger()
+
+    def _cerrar(self, dt):
+        """Cierra el snackbar tras DURACION segundos sin mensajes nuevos."""
+        if self._snackbar.parent is not None and not self._cerrando:
+            self._cerrando = True
+            self._snackbar.dismiss()
+
+    def _on_parent(self, snackbar, parent):
+        """Fin del cierre: el snackbar salió de la ventana; reabre si llego un mensaje."""
+        if parent is not None:
+            return
+        self._cerrando = False
+        if self._reabrir:
+            self._reabrir = False
+            snackbar.open()
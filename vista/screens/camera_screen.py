@@ -1,6 +1,12 @@
 # vista/screens/camera_screen.py
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 from kivy.graphics import PushMatrix, PopMatrix, Rotate
 from kivy.clock import Clock
+from kivy.animation import Animation
+from kivy.core.window import Window
 from kivy.utils import platform
 from kivy.uix.camera import Camera
 from kivy.graphics.texture import Texture
@@ -12,19 +18,41 @@ from kivymd.uix.button import MDButton, MDButtonText
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.dialog import MDDialog, MDDialogHeadlineText, MDDialogSupportingText, MDDialogButtonContainer, MDDialogContentContainer
 from kivymd.uix.textfield import MDTextField, MDTextFieldHintText
-from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
+
+from vista.components.notificador import Notificador
 
 # Numpy siempre disponible (necesario para escaneo optimizado)
 import numpy as np
 
+# Referencias a nivel de módulo para el camino por frame (evita LOAD_ATTR repetidos)
+_np_frombuffer = np.frombuffer
+
+# Ancho máximo del frame que se entrega a pyzbar (su costo crece con el número de pixeles)
+DECODE_MAX_WIDTH = 800
+
 # Para escaneo de códigos (PC)
 try:
     from pyzbar import pyzbar
     import cv2
+    _pyzbar_decode = pyzbar.decode
+    _cv2_cvtColor = cv2.cvtColor
+    _cv2_resize = cv2.resize
+    _RGBA2GRAY = cv2.COLOR_RGBA2GRAY
+    _RGBA2BGR = cv2.COLOR_RGBA2BGR
+    _INTER_AREA = cv2.INTER_AREA
     PYZBAR_AVAILABLE = True
 except ImportError:
     PYZBAR_AVAILABLE = False
 
+# Ventana (s) en la que un mismo código se ignora en on_code_scanned
+SCAN_DEBOUNCE_S = 1.5
+
+# Trazas de tiempo por frame en scan_frame_android (cada print cruza a logcat en Android)
+DEBUG_SCAN = False
+
+# Pesos de luminancia (BT.601 en punto fijo /256): Y = (77R + 150G + 29B) >> 8
+_LUMA_R, _LUMA_G, _LUMA_B = 77, 150, 29
+
 # Para escaneo en Android via ZXing Core embebido
 ANDROID_SCANNER = False
 _autoclass = None
@@ -41,7 +69,7 @@ if platform == "android":
         _MultiFormatReader = _autoclass('com.google.zxing.MultiFormatReader')
         _BinaryBitmap = _autoclass('com.google.zxing.BinaryBitmap')
         _HybridBinarizer = _autoclass('com.google.zxing.common.HybridBinarizer')
-        _RGBLuminanceSource = _autoclass('com.google.zxing.RGBLuminanceSource')
+        _PlanarYUVLuminanceSource = _autoclass('com.google.zxing.PlanarYUVLuminanceSource')
         _DecodeHintType = _autoclass('com.google.zxing.DecodeHintType')
         _BarcodeFormat = _autoclass('com.google.zxing.BarcodeFormat')
         _HashMap = _autoclass('java.util.HashMap')
@@ -84,18 +112,49 @@ class CameraScreen(MDScreen):
     Pantalla de cámara con escaneo de códigos y búsqueda en BD.
     """
 
+    # Servicio de vibración Android, resuelto una sola vez (ver _vibrar)
+    _vibrator = None
+    _has_vibrator = None
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.camera_widget = None
         self.scanning_active = False
         self.last_scanned_code = None
+        self._last_code = None      # Último código procesado por on_code_scanned (antirrebote)
+        self._last_code_ts = 0.0
         self.scan_event = None
-        self.dialog = None
+        self.dialog = None        # Diálogo visible actualmente
+        self._dialog_producto = None  # Diálogos construidos una vez y reutilizados
+        self._dialog_nuevo = None
+        self._dialog_manual = None
         self.current_producto = None
         self._camera_init_attempts = 0
         self._camera_ready = False
-        self._recent_scans = []   # Últimos 5 productos escaneados [(nombre, codigo), ...]
+        self._ids_ready = False       # Referencias directas a widgets del .kv (ver _cache_ids)
+        self._camera_container = None
+        self._status_label = None
+        self._controls_container = None
+        self._recent_bar = None
+        self._recent_scans = deque(maxlen=5)  # Últimos 5 productos escaneados [(nombre, codigo), ...]
+        self._recent_codes = set()            # Códigos en _recent_scans (pertenencia O(1))
+        self._chip_cache = {}     # codigo -> (MDButton, MDButtonText) de la barra de recientes
+        self._recent_hint = None  # Etiqueta "Recientes aparecerán aquí" (se crea una vez)
         self._cantidad_mov = 1    # Cantidad para el movimiento actual
+        self._pending_movs = []   # Movimientos por enviar [(codigo, tipo, cantidad, usuario), ...]
+        self._optimistas = {}     # codigo -> producto con stock ya ajustado localmente (para rollback)
+        self._flush_movs_trigger = Clock.create_trigger(self._flush_movs, 1.0)
+        self._scan_executor = ThreadPoolExecutor(max_workers=1)  # Hilo de decodificación ZXing
+        self._scan_future = None  # Decodificación en curso (una a la vez)
+        self._tex_wh = (0, 0)     # Tamaño de textura para el que se calculó el ROI
+        self._roi_params = None   # (start_x, start_y, crop_w, crop_h) del recorte central
+        self._y_bytes = None      # bytearray entregado a Java como byte[] (sin copia intermedia)
+        self._y_buf = None        # Vista numpy (crop_h, crop_w) sobre _y_bytes
+        self._y16_buf = None      # Acumuladores uint16 para el cálculo de luminancia
+        self._y16_tmp = None
+        self._last_pixel_sig = None  # Firma del último frame decodificado (detecta duplicados)
+        self._gray_buf = None     # Destinos reutilizados de cvtColor/resize (escaneo pyzbar)
+        self._small_buf = None
 
         # Inicializar repositorio
         if REPOSITORY_AVAILABLE:
@@ -116,7 +175,7 @@ class CameraScreen(MDScreen):
         self._camera_init_attempts += 1
 
         # Verificar que el layout esté listo
-        if not hasattr(self, 'ids') or 'camera_container' not in self.ids:
+        if not self._cache_ids():
             if self._camera_init_attempts < 5:
                 print(f"⏳ Esperando layout (intento {self._camera_init_attempts})...")
                 Clock.schedule_once(self._init_camera_safe, 0.2)
@@ -128,10 +187,31 @@ class CameraScreen(MDScreen):
         # Layout listo, iniciar cámara
         self.check_permissions_and_start_cam()
 
+    def _cache_ids(self):
+        """Guarda referencias directas a los widgets del .kv (evita consultar self.ids en cada llamada)."""
+        if self._ids_ready:
+            return True
+        if 'camera_container' not in self.ids:
+            return False
+
+        ids = self.ids
+        self._camera_container = ids.camera_container
+        self._status_label = ids.get('status_label')
+        self._controls_container = ids.get('controls_container')
+        self._recent_bar = ids.get('recent_bar')
+        self._ids_ready = True
+        return True
+
+    def _set_status(self, texto):
+        """Actualiza la etiqueta de estado si existe."""
+        if self._status_label:
+            self._status_label.text = texto
+
     def on_leave(self, *args):
         """Detiene la cámara al salir para liberar recursos."""
         print("✓ Saliendo de CameraScreen...")
         self.stop_scanning()
+        self._flush_movs()
         self._camera_ready = False
         if self.camera_widget:
             self.camera_widget.play = False  # Pausamos para ahorrar batería
@@ -189,11 +269,11 @@ class CameraScreen(MDScreen):
     
     def _setup_camera_ui(self):
         """Configura la UI de la cámara."""
-        if 'camera_container' not in self.ids:
+        if not self._camera_container:
             print("✗ camera_container no encontrado")
             return
 
-        container = self.ids.camera_container
+        container = self._camera_container
 
         # Solo añadir si no está ya en el container
         if self.camera_widget.parent != container:
@@ -201,7 +281,7 @@ class CameraScreen(MDScreen):
             container.add_widget(self.camera_widget)
             print("✓ Cámara añadida al layout")
 
-        if 'controls_container' in self.ids:
+        if self._controls_container:
             self._create_controls()
 
     def _activate_camera(self, dt):
@@ -220,8 +300,7 @@ class CameraScreen(MDScreen):
         self._camera_ready = True
         print(f"✓ Cámara activada ({self.camera_widget.width}x{self.camera_widget.height})")
 
-        if 'status_label' in self.ids:
-            self.ids.status_label.text = "Apunte la cámara al código de barras"
+        self._set_status("Apunte la cámara al código de barras")
             
     # ... (El resto de tus métodos: _create_controls, toggle_scanning, etc. se mantienen igual) ...
     # Copia aquí el resto de métodos (_create_controls, toggle_scanning, start_scanning, 
@@ -230,7 +309,7 @@ class CameraScreen(MDScreen):
 
     def _create_controls(self):
         """Crea botones de control grandes (UX para operación con una mano)."""
-        controls = self.ids.controls_container
+        controls = self._controls_container
         controls.clear_widgets()
 
         if platform == "android" and ANDROID_SCANNER:
@@ -303,145 +382,222 @@ class CameraScreen(MDScreen):
         self.scanning_active = True
         self.last_scanned_code = None
         self._scan_frame_count = 0
+        self._last_pixel_sig = None
         if hasattr(self, 'scan_button'):
             self.scan_button.children[0].text = "Detener"
-        if 'status_label' in self.ids:
-            self.ids.status_label.text = "Escaneando..."
+        self._set_status("Escaneando...")
         # Escanear cada 500ms
         self.scan_event = Clock.schedule_interval(self.scan_frame_android, 0.5)
         print("[SCAN] Intervalo programado cada 0.5s")
 
     def scan_frame_android(self, dt):
-        """Escanea frame actual usando ZXing Core (Optimizado con array operations)."""
-        import time
+        """
+        Captura el frame actual y delega la decodificación ZXing al hilo de escaneo.
+        La lectura de texture.pixels queda en el hilo de Kivy (requiere contexto GL).
+        """
+        # Un tick ya encolado puede llegar tras stop_scanning / on_leave
+        if not self.scanning_active or not self._camera_ready:
+            return
+
         self._scan_frame_count = getattr(self, '_scan_frame_count', 0) + 1
         frame_num = self._scan_frame_count
 
         # 1. Validaciones iniciales
         if not self.camera_widget or not self.camera_widget.texture:
-            print(f"[SCAN #{frame_num}] Sin cámara o textura")
+            if DEBUG_SCAN:
+                print(f"[SCAN #{frame_num}] Sin cámara o textura")
             return
-        if not ANDROID_SCANNER:
-            print(f"[SCAN #{frame_num}] ANDROID_SCANNER=False")
+        if not ANDROID_SCANNER or not _zxing_reader:
+            if DEBUG_SCAN:
+                print(f"[SCAN #{frame_num}] ZXing no disponible")
             return
-        if not _zxing_reader:
-            print(f"[SCAN #{frame_num}] _zxing_reader=None")
+
+        # Decodificación anterior aún en curso: descartar este frame
+        if self._scan_future is not None and not self._scan_future.done():
+            if DEBUG_SCAN:
+                print(f"[SCAN #{frame_num}] Decodificación en curso, frame omitido")
             return
 
-        t0 = time.time()
         try:
             texture = self.camera_widget.texture
-            w = int(texture.width)
-            h = int(texture.height)
+            w, h = texture.size
             pixels = texture.pixels
-            t1 = time.time()
-            print(f"[SCAN #{frame_num}] Textura: {w}x{h}, pixels={len(pixels)} bytes ({(t1-t0)*1000:.0f}ms)")
-
-            # Convertir a numpy array
-            pixel_bytes = bytes(pixels) if not isinstance(pixels, bytes) else pixels
-            img = np.frombuffer(pixel_bytes, dtype=np.uint8).reshape(h, w, 4)
-            t2 = time.time()
-            print(f"[SCAN #{frame_num}] Numpy reshape OK ({(t2-t1)*1000:.0f}ms)")
-
-            # 3. Recorte central (ROI más pequeño para velocidad)
-            crop_w = min(w, 320)
-            crop_h = min(h, 240)
-            start_x = (w - crop_w) // 2
-            start_y = (h - crop_h) // 2
-
-            roi = img[start_y:start_y+crop_h, start_x:start_x+crop_w]
-            t3 = time.time()
-            print(f"[SCAN #{frame_num}] ROI {crop_w}x{crop_h} ({(t3-t2)*1000:.0f}ms)")
+        except Exception as e:
+            print(f"[SCAN #{frame_num}] ERROR leyendo textura: {e}")
+            return
 
-            # 4. Convertir RGBA a ARGB int32 (formato Java) - operación vectorizada
-            r = roi[:, :, 0].astype(np.int32)
-            g = roi[:, :, 1].astype(np.int32)
-            b = roi[:, :, 2].astype(np.int32)
+        pixel_bytes = bytes(pixels) if not isinstance(pixels, bytes) else pixels
+
+        # Saltar frames que la cámara aún no ha renovado. La firma se toma dentro
+        # del recorte central que se decodifica (8 filas, muestreo con salto), no
+        # en las esquinas: un borde negro o blanco fijo no debe congelar el escaneo.
+        crop_w = min(w, 320)
+        crop_h = min(h, 240)
+        x0 = ((w - crop_w) // 2) * 4
+        x1 = x0 + crop_w * 4
+        stride = w * 4
+        y0 = (h - crop_h) // 2
+        sig = hash(b''.join(
+            pixel_bytes[fila * stride + x0:fila * stride + x1:29]
+            for fila in range(y0, y0 + crop_h, max(1, crop_h // 8))
+        ))
+        if sig == self._last_pixel_sig:
+            if DEBUG_SCAN:
+                print(f"[SCAN #{frame_num}] Frame repetido, omitido")
+            return
+        self._last_pixel_sig = sig
 
-            # ARGB con alpha=255: 0xFF000000 | (R << 16) | (G << 8) | B
-            argb = (0xFF << 24) | (r << 16) | (g << 8) | b
+        self._scan_future = self._scan_executor.submit(
+            self._decode_frame_android, pixel_bytes, w, h, frame_num
+        )
+        self._scan_future.add_done_callback(self._on_decode_done)
 
-            # Convertir a signed int32 (Java usa signed)
-            argb = argb.astype(np.int32)
-            t4 = time.time()
-            print(f"[SCAN #{frame_num}] ARGB conversion ({(t4-t3)*1000:.0f}ms)")
+    def _decode_frame_android(self, pixel_bytes, w, h, frame_num):
+        """
+        Decodifica un frame RGBA con ZXing (se ejecuta en el hilo de escaneo).
 
-            # Flatten a lista para ZXing
-            pixel_array = argb.flatten().tolist()
-            t5 = time.time()
-            print(f"[SCAN #{frame_num}] tolist() {len(pixel_array)} elementos ({(t5-t4)*1000:.0f}ms)")
+        Returns:
+            Lista [(code_data, code_type)] (vacía si no encontró código)
+        """
+        if DEBUG_SCAN:
+            t_start = time.monotonic()
+        try:
+            # 2. Convertir a numpy array
+            img = _np_frombuffer(pixel_bytes, dtype=np.uint8).reshape(h, w, 4)
+
+            # 3. Recorte central (ROI más pequeño para velocidad).
+            #    Parámetros y buffers solo se recalculan si cambia el tamaño de textura.
+            if (w, h) != self._tex_wh:
+                self._tex_wh = (w, h)
+                crop_w = min(w, 320)
+                crop_h = min(h, 240)
+                self._roi_params = ((w - crop_w) // 2, (h - crop_h) // 2, crop_w, crop_h)
+                self._y_bytes = bytearray(crop_w * crop_h)
+                self._y_buf = _np_frombuffer(self._y_bytes, dtype=np.uint8).reshape(crop_h, crop_w)
+                self._y16_buf = np.empty((crop_h, crop_w), dtype=np.uint16)
+                self._y16_tmp = np.empty((crop_h, crop_w), dtype=np.uint16)
+            start_x, start_y, crop_w, crop_h = self._roi_params
 
-            # 5. Decodificación con ZXing
-            source = _RGBLuminanceSource(crop_w, crop_h, pixel_array)
-            t6 = time.time()
-            print(f"[SCAN #{frame_num}] RGBLuminanceSource ({(t6-t5)*1000:.0f}ms)")
+            roi = img[start_y:start_y+crop_h, start_x:start_x+crop_w]
 
+            # 4. Luminancia Y sobre buffers reutilizados. ZXing solo necesita el plano Y:
+            #    evita empaquetar ARGB int[] y la conversión a luminancia del lado Java.
+            #    Tres pasadas uint16 in-place: más rápido que np.dot (sin BLAS para enteros
+            #    y con un eje interno de solo 3 elementos).
+            y_buf, y16, tmp = self._y_buf, self._y16_buf, self._y16_tmp
+
+            np.multiply(roi[:, :, 0], _LUMA_R, out=y16, dtype=np.uint16)
+            np.multiply(roi[:, :, 1], _LUMA_G, out=tmp, dtype=np.uint16)
+            y16 += tmp
+            np.multiply(roi[:, :, 2], _LUMA_B, out=tmp, dtype=np.uint16)
+            y16 += tmp
+            np.right_shift(y16, 8, out=y_buf, casting='unsafe')
+
+            # 5. Decodificación con ZXing: y_buf escribe directo en _y_bytes, que
+            #    pyjnius copia a byte[] en bloque (sin lista Python ni tobytes())
+            source = _PlanarYUVLuminanceSource(
+                self._y_bytes, crop_w, crop_h, 0, 0, crop_w, crop_h, False
+            )
             bitmap = _BinaryBitmap(_HybridBinarizer(source))
-            t7 = time.time()
-            print(f"[SCAN #{frame_num}] BinaryBitmap ({(t7-t6)*1000:.0f}ms)")
-
             result = _zxing_reader.decodeWithState(bitmap)
-            t8 = time.time()
-            print(f"[SCAN #{frame_num}] decodeWithState ({(t8-t7)*1000:.0f}ms) result={result is not None}")
 
-            if result:
-                code_data = result.getText()
-                code_type = result.getBarcodeFormat().toString()
-                print(f"[SCAN #{frame_num}] CÓDIGO ENCONTRADO: {code_data} ({code_type})")
-
-                if code_data and code_data != self.last_scanned_code:
-                    self.last_scanned_code = code_data
-                    print(f"✓ Código escaneado: {code_data} ({code_type})")
-                    Clock.schedule_once(lambda dt: self.on_code_scanned(code_data, code_type), 0)
+            if DEBUG_SCAN:
+                print(f"[SCAN #{frame_num}] {w}x{h} result={result is not None} "
+                      f"({(time.monotonic() - t_start) * 1000:.0f}ms)")
 
-            print(f"[SCAN #{frame_num}] TOTAL: {(t8-t0)*1000:.0f}ms")
+            if result:
+                return [(result.getText(), result.getBarcodeFormat().toString())]
 
         except Exception as e:
             error_name = type(e).__name__
             if "NotFoundException" not in str(e) and "NotFoundException" not in error_name:
                 print(f"[SCAN #{frame_num}] ERROR: {error_name}: {e}")
-            else:
-                print(f"[SCAN #{frame_num}] No code found ({(time.time()-t0)*1000:.0f}ms)")
+            elif DEBUG_SCAN:
+                print(f"[SCAN #{frame_num}] No code found ({(time.monotonic() - t_start) * 1000:.0f}ms)")
         finally:
-            if _zxing_reader:
-                _zxing_reader.reset()
+            _zxing_reader.reset()
+        return []
+
+    def _on_decode_done(self, future):
+        """Callback del executor (hilo de escaneo): reenvía el resultado al hilo de Kivy."""
+        hits = future.result()
+        if hits:
+            Clock.schedule_once(lambda dt: self._on_codigos_decodificados(hits))
+
+    def _on_codigos_decodificados(self, hits):
+        """Procesa en el hilo de Kivy los códigos decodificados por ZXing o pyzbar."""
+        # La decodificación pudo terminar después de detener el escaneo
+        if not self.scanning_active:
+            return
+        for code_data, code_type in hits:
+            # El antirrebote va antes de registrar last_scanned_code: si no, un código
+            # descartado quedaría filtrado tras reiniciar el escaneo
+            if code_data and code_data != self.last_scanned_code and not self._es_rebote(code_data):
+                self.last_scanned_code = code_data
+                print(f"✓ Código escaneado: {code_data} ({code_type})")
+                self.on_code_scanned(code_data, code_type)
+                break
+
+    def _abrir_dialog(self, dialog):
+        """Cierra el diálogo visible (si es otro) y abre el indicado."""
+        if self.dialog and self.dialog is not dialog:
+            self.dialog.dismiss()
+        self.dialog = dialog
+        self._terminar_cierre(dialog)
+        dialog.open()
+
+    @staticmethod
+    def _terminar_cierre(dialog):
+        """
+        Completa de inmediato el cierre animado de un diálogo reutilizado.
+        Reabrirlo dentro de la animación (~0.2s) falla: su scrim sigue en la ventana
+        (WidgetException, y el diálogo queda marcado abierto para siempre) o el
+        remove_dialog pendiente lo quita recién reabierto.
+        """
+        if getattr(dialog, '_is_open', False):
+            return  # Ya visible: open() no hace nada
+        scrim = getattr(dialog, '_scrim', None)
+        for widget in (dialog, scrim):
+            if widget is not None and widget.parent is not None:
+                Animation.cancel_all(widget)  # cancel no dispara on_complete
+                Window.remove_widget(widget)
 
     def _entrada_manual(self, *args):
         """Muestra diálogo para ingresar código manualmente."""
-        if self.dialog:
-            self.dialog.dismiss()
-
-        self.codigo_manual_field = MDTextField(
-            MDTextFieldHintText(text="Código de barras"),
-            mode="outlined",
-        )
+        if self._dialog_manual is None:
+            self.codigo_manual_field = MDTextField(
+                MDTextFieldHintText(text="Código de barras"),
+                mode="outlined",
+            )
 
-        self.dialog = MDDialog(
-            MDDialogHeadlineText(text="Ingresar Código"),
-            MDDialogContentContainer(
-                MDBoxLayout(
-                    self.codigo_manual_field,
-                    orientation="vertical",
-                    spacing="12dp",
-                    padding="12dp",
-                    adaptive_height=True,
+            self._dialog_manual = MDDialog(
+                MDDialogHeadlineText(text="Ingresar Código"),
+                MDDialogContentContainer(
+                    MDBoxLayout(
+                        self.codigo_manual_field,
+                        orientation="vertical",
+                        spacing="12dp",
+                        padding="12dp",
+                        adaptive_height=True,
+                    ),
                 ),
-            ),
-            MDDialogButtonContainer(
-                MDButton(
-                    MDButtonText(text="Cancelar"),
-                    style="text",
-                    on_release=lambda x: self.dialog.dismiss()
+                MDDialogButtonContainer(
+                    MDButton(
+                        MDButtonText(text="Cancelar"),
+                        style="text",
+                        on_release=lambda x: self.dialog.dismiss()
+                    ),
+                    MDButton(
+                        MDButtonText(text="Buscar"),
+                        style="filled",
+                        on_release=self._procesar_codigo_manual
+                    ),
+                    spacing="8dp",
                 ),
-                MDButton(
-                    MDButtonText(text="Buscar"),
-                    style="filled",
-                    on_release=self._procesar_codigo_manual
-                ),
-                spacing="8dp",
-            ),
-        )
-        self.dialog.open()
+            )
+
+        self.codigo_manual_field.text = ""
+        self._abrir_dialog(self._dialog_manual)
 
     def _procesar_codigo_manual(self, *args):
         """Procesa código ingresado manualmente."""
@@ -480,29 +636,48 @@ class CameraScreen(MDScreen):
             if hasattr(self, 'scan_button'): self.scan_button.children[0].text = "Escanear"
 
     def scan_frame(self, dt):
+        """Captura el frame actual y delega la decodificación pyzbar al hilo de escaneo."""
+        if not self.scanning_active or not self._camera_ready: return
         if not self.camera_widget or not self.camera_widget.texture: return
+        # Decodificación anterior aún en curso: descartar este frame
+        if self._scan_future is not None and not self._scan_future.done(): return
         try:
             texture = self.camera_widget.texture
-            frame = self._texture_to_numpy(texture)
-            barcodes = pyzbar.decode(frame)
-            if barcodes:
-                for barcode in barcodes:
-                    code_data = barcode.data.decode('utf-8')
-                    if code_data != self.last_scanned_code:
-                        self.last_scanned_code = code_data
-                        self.on_code_scanned(code_data, barcode.type)
-                        break
+            pixels, size = texture.pixels, texture.size
+        except Exception as e:
+            print(f"✗ Error scan: {e}")
+            return
+        self._scan_future = self._scan_executor.submit(self._decode_frame_pyzbar, pixels, size)
+        self._scan_future.add_done_callback(self._on_decode_done)
+
+    def _decode_frame_pyzbar(self, pixels, size):
+        """Decodifica un frame RGBA con pyzbar (se ejecuta en el hilo de escaneo)."""
+        try:
+            frame = self._frame_for_decode(pixels, size)
+            return [(b.data.decode('utf-8'), b.type) for b in _pyzbar_decode(frame)]
         except Exception as e:
             print(f"✗ Error scan: {e}")
+            return []
+
+    def _es_rebote(self, code_data):
+        """
+        Antirrebote: el mismo código repetido en < SCAN_DEBOUNCE_S (cámara sobre el
+        código, doble toque en un reciente) no repite la búsqueda ni el diálogo.
+        """
+        return (code_data == self._last_code
+                and time.monotonic() - self._last_code_ts < SCAN_DEBOUNCE_S)
 
     def on_code_scanned(self, code_data, code_type):
         """Procesa código escaneado y busca en BD."""
+        if self._es_rebote(code_data):
+            return
+        self._last_code, self._last_code_ts = code_data, time.monotonic()
+
         print(f"✓ CÓDIGO: {code_data} (tipo: {code_type})")
         self.stop_scanning()
         self._vibrar()  # Feedback háptico inmediato
 
-        if 'status_label' in self.ids:
-            self.ids.status_label.text = f"Buscando: {code_data}..."
+        self._set_status(f"Buscando: {code_data}...")
 
         # Buscar en repositorio (cache + Firebase)
         if self.repository:
@@ -516,27 +691,28 @@ class CameraScreen(MDScreen):
     def _mostrar_resultado(self, producto, codigo):
         """Muestra resultado de búsqueda en diálogo."""
         if producto:
+            # Con movimientos aún sin enviar, mostrar el stock ya ajustado localmente
+            producto = self._optimistas.get(codigo, producto)
             nombre = producto.get('nombre', 'Producto')
-            # Agregar a recientes (máximo 5, sin duplicados)
-            entry = (nombre, codigo)
-            if entry in self._recent_scans:
-                self._recent_scans.remove(entry)
-            self._recent_scans.insert(0, entry)
-            self._recent_scans = self._recent_scans[:5]
+            # Agregar a recientes (máximo 5, sin duplicados por código)
+            if codigo in self._recent_codes:
+                self._recent_scans = deque(
+                    (e for e in self._recent_scans if e[1] != codigo), maxlen=5
+                )
+            self._recent_scans.appendleft((nombre, codigo))
+            self._recent_codes = {e[1] for e in self._recent_scans}
             self._update_recent_bar()
 
-            if 'status_label' in self.ids:
-                self.ids.status_label.text = f"✓ {nombre}"
+            self._set_status(f"✓ {nombre}")
             self._mostrar_dialog_producto(producto)
         else:
-            if 'status_label' in self.ids:
-                self.ids.status_label.text = f"No encontrado: {codigo}"
+            self._set_status(f"No encontrado: {codigo}")
             self._mostrar_dialog_nuevo(codigo)
 
     def _mostrar_dialog_producto(self, producto):
         """Diálogo simplificado con selector +/- directo (UX mejorado para almacén)."""
-        if self.dialog:
-            self.dialog.dismiss()
+        if self._dialog_producto is None:
+            self._dialog_producto = self._crear_dialog_producto()
 
         nombre = producto.get('nombre', 'Sin nombre')
         cantidad_actual = producto.get('cantidad', 0)
@@ -545,6 +721,15 @@ class CameraScreen(MDScreen):
         self.current_producto = producto
         self._cantidad_mov = 1
 
+        self._producto_titulo.text = nombre
+        self._producto_info_label.text = f"Stock: {cantidad_actual}   |   {ubicacion}"
+        self._mov_cantidad_label.text = "1"
+        self._abrir_dialog(self._dialog_producto)
+
+    def _crear_dialog_producto(self):
+        """Construye (una sola vez) el diálogo de movimiento de producto."""
+        self._producto_titulo = MDDialogHeadlineText(text="")
+
         # Label grande para mostrar la cantidad del movimiento
         self._mov_cantidad_label = MDLabel(
             text="1",
@@ -582,8 +767,8 @@ class CameraScreen(MDScreen):
             spacing="8dp",
         )
 
-        info_label = MDLabel(
-            text=f"Stock: {cantidad_actual}   |   {ubicacion}",
+        self._producto_info_label = MDLabel(
+            text="",
             halign="center",
             theme_text_color="Secondary",
             size_hint_y=None,
@@ -592,11 +777,11 @@ class CameraScreen(MDScreen):
             role="large",
         )
 
-        self.dialog = MDDialog(
-            MDDialogHeadlineText(text=nombre),
+        return MDDialog(
+            self._producto_titulo,
             MDDialogContentContainer(
                 MDBoxLayout(
-                    info_label,
+                    self._producto_info_label,
                     row_cantidad,
                     orientation="vertical",
                     spacing="4dp",
@@ -618,13 +803,21 @@ class CameraScreen(MDScreen):
                 spacing="8dp",
             ),
         )
-        self.dialog.open()
 
     def _mostrar_dialog_nuevo(self, codigo):
         """Muestra diálogo para crear nuevo producto con campos requeridos."""
-        if self.dialog:
-            self.dialog.dismiss()
+        if self._dialog_nuevo is None:
+            self._dialog_nuevo = self._crear_dialog_nuevo()
 
+        self._codigo_nuevo = codigo  # Guardar código para usar al registrar
+        self._nuevo_codigo_text.text = f"Código: {codigo}"
+        self.nombre_producto_field.text = ""
+        self.ubicacion_field.text = ""
+        self.cantidad_inicial_field.text = ""
+        self._abrir_dialog(self._dialog_nuevo)
+
+    def _crear_dialog_nuevo(self):
+        """Construye (una sola vez) el diálogo de registro de producto nuevo."""
         # Campos del formulario
         self.nombre_producto_field = MDTextField(
             MDTextFieldHintText(text="Nombre del producto *"),
@@ -642,13 +835,11 @@ class CameraScreen(MDScreen):
             input_filter="int",
         )
 
-        self._codigo_nuevo = codigo  # Guardar código para usar al registrar
+        self._nuevo_codigo_text = MDDialogSupportingText(text="")
 
-        self.dialog = MDDialog(
+        return MDDialog(
             MDDialogHeadlineText(text="Registrar Producto Nuevo"),
-            MDDialogSupportingText(
-                text=f"Código: {codigo}"
-            ),
+            self._nuevo_codigo_text,
             MDDialogContentContainer(
                 MDBoxLayout(
                     self.nombre_producto_field,
@@ -674,7 +865,6 @@ class CameraScreen(MDScreen):
                 spacing="8dp",
             ),
         )
-        self.dialog.open()
 
     def _mostrar_dialog_cantidad(self, tipo_movimiento):
         """Muestra diálogo para ingresar cantidad."""
@@ -738,41 +928,29 @@ class CameraScreen(MDScreen):
             self._mostrar_snackbar("Cantidad inválida")
             return
 
-        codigo = self.current_producto.get('codigo_barras')
-
         if self.dialog:
             self.dialog.dismiss()
 
-        if self.repository:
-            # Obtener usuario autenticado
-            from kivy.app import App
-            app = App.get_running_app()
-            usuario = getattr(app, 'current_user', None) or "usuario_app"
-
-            if tipo == "entrada":
-                self.repository.registrar_entrada(
-                    codigo_barras=codigo,
-                    cantidad=cantidad,
-                    usuario=usuario,
-                    callback=lambda ok, msg: self._movimiento_completado(ok, tipo, cantidad, msg)
-                )
-            else:
-                self.repository.registrar_salida(
-                    codigo_barras=codigo,
-                    cantidad=cantidad,
-                    usuario=usuario,
-                    callback=lambda ok, msg: self._movimiento_completado(ok, tipo, cantidad, msg)
-                )
-        else:
-            self._mostrar_snackbar("⚠ Repositorio no disponible")
+        self._encolar_movimiento(self.current_producto.get('codigo_barras'), tipo, cantidad)
 
-    def _movimiento_completado(self, exito, tipo, cantidad, mensaje=""):
-        """Callback cuando se completa un movimiento."""
+    def _movimiento_completado(self, exito, codigo, tipo, cantidad, mensaje=""):
+        """
+        Callback cuando el repositorio procesa un movimiento.
+        El stock local y el snackbar ya se actualizaron al encolar (optimista):
+        en éxito no hay nada que hacer; en error se revierte el ajuste local.
+        _flush_movs descarta el stock local al terminar el lote.
+        """
         if exito:
-            emoji = "➕" if tipo == "entrada" else "➖"
-            self._mostrar_snackbar(f"{emoji} {tipo.capitalize()}: {cantidad} unidades")
-        else:
-            self._mostrar_snackbar(mensaje or f"✗ Error al registrar {tipo}")
+            return
+
+        producto = self._optimistas.get(codigo)
+        if producto is not None:
+            delta = cantidad if tipo == "entrada" else -cantidad
+            producto['cantidad'] = producto.get('cantidad', 0) - delta
+            if producto is self.current_producto and hasattr(self, '_producto_info_label'):
+                ubicacion = producto.get('ubicacion', 'No especificada')
+                self._producto_info_label.text = f"Stock: {producto['cantidad']}   |   {ubicacion}"
+        self._mostrar_snackbar(mensaje or f"✗ Error al registrar {tipo}")
 
     def _guardar_producto_nuevo(self):
         """Guarda el producto nuevo en la base de datos."""
@@ -846,89 +1024,123 @@ class CameraScreen(MDScreen):
         if not self.current_producto:
             return
 
-        cantidad = self._cantidad_mov
-        codigo = self.current_producto.get('codigo_barras')
-
         if self.dialog:
             self.dialog.dismiss()
 
-        if self.repository:
-            from kivy.app import App
-            app = App.get_running_app()
-            usuario = getattr(app, 'current_user', None) or "usuario_app"
-
-            if tipo == "entrada":
-                self.repository.registrar_entrada(
-                    codigo_barras=codigo,
-                    cantidad=cantidad,
-                    usuario=usuario,
-                    callback=lambda ok, msg: self._movimiento_completado(ok, tipo, cantidad, msg)
-                )
-            else:
-                self.repository.registrar_salida(
-                    codigo_barras=codigo,
-                    cantidad=cantidad,
-                    usuario=usuario,
-                    callback=lambda ok, msg: self._movimiento_completado(ok, tipo, cantidad, msg)
-                )
-        else:
+        self._encolar_movimiento(self.current_producto.get('codigo_barras'), tipo, self._cantidad_mov)
+
+    def _encolar_movimiento(self, codigo, tipo, cantidad):
+        """
+        Encola un movimiento para envío diferido (write-behind).
+        Los movimientos encolados dentro de ~1s se envían juntos; on_leave y la App
+        (on_pause/on_stop) vacían la cola antes de que Android pueda matar el proceso.
+
+        Actualización optimista: el stock de current_producto se ajusta y se confirma
+        al usuario de inmediato; _movimiento_completado revierte si el repositorio falla.
+        """
+        if not self.repository:
             self._mostrar_snackbar("Repositorio no disponible")
+            return
+
+        producto = self.current_producto
+        cantidad_actual = producto.get('cantidad', 0)
+        if tipo == "salida" and cantidad > cantidad_actual:
+            self._mostrar_snackbar(f"Stock insuficiente. Disponible: {cantidad_actual}")
+            return
+
+        from kivy.app import App
+        app = App.get_running_app()
+        usuario = getattr(app, 'current_user', None) or "usuario_app"
+
+        producto['cantidad'] = cantidad_actual + (cantidad if tipo == "entrada" else -cantidad)
+        self._optimistas[codigo] = producto
+        emoji = "➕" if tipo == "entrada" else "➖"
+        self._mostrar_snackbar(f"{emoji} {tipo.capitalize()}: {cantidad} unidades")
+
+        self._pending_movs.append((codigo, tipo, cantidad, usuario))
+        self._flush_movs_trigger()
+
+    def _flush_movs(self, dt=None):
+        """Envía al repositorio los movimientos pendientes, agrupados por producto y tipo."""
+        self._flush_movs_trigger.cancel()
+        if not self._pending_movs or not self.repository:
+            return
+
+        movimientos, self._pending_movs = self._pending_movs, []
+        self.repository.registrar_movimientos_batch(
+            movimientos,
+            callback=lambda ok, msg, codigo, tipo, cantidad: self._movimiento_completado(ok, codigo, tipo, cantidad, msg)
+        )
+        # Lote aplicado al cache: el stock local ya no aporta nada, salvo en códigos
+        # que recibieron movimientos nuevos durante el envío
+        pendientes = {m[0] for m in self._pending_movs}
+        for codigo in {m[0] for m in movimientos} - pendientes:
+            self._optimistas.pop(codigo, None)
 
     def _vibrar(self, duracion_ms=80):
         """Vibración háptica al escanear (solo Android)."""
         if platform != "android":
             return
         try:
-            from jnius import autoclass
-            PythonActivity = autoclass('org.kivy.android.PythonActivity')
-            activity = PythonActivity.mActivity
-            vibrator = activity.getSystemService('vibrator')
-            if vibrator and vibrator.hasVibrator():
-                vibrator.vibrate(duracion_ms)
+            if CameraScreen._has_vibrator is None:
+                from jnius import autoclass
+                PythonActivity = autoclass('org.kivy.android.PythonActivity')
+                vibrator = PythonActivity.mActivity.getSystemService('vibrator')
+                CameraScreen._vibrator = vibrator
+                CameraScreen._has_vibrator = bool(vibrator and vibrator.hasVibrator())
+            if CameraScreen._has_vibrator:
+                CameraScreen._vibrator.vibrate(duracion_ms)
         except Exception as e:
             print(f"⚠ Vibración: {e}")
 
     def _update_recent_bar(self):
         """Actualiza la barra horizontal de recientes."""
-        if 'recent_bar' not in self.ids:
+        if not self._cache_ids() or not self._recent_bar:
             return
 
-        bar = self.ids.recent_bar
+        bar = self._recent_bar
         bar.clear_widgets()
 
         if not self._recent_scans:
-            hint = MDLabel(
-                text="Recientes aparecerán aquí",
-                theme_text_color="Hint",
-                font_style="Label",
-                role="small",
-                size_hint_x=None,
-                width="220dp",
-                halign="center",
-            )
-            bar.add_widget(hint)
+            if self._recent_hint is None:
+                self._recent_hint = MDLabel(
+                    text="Recientes aparecerán aquí",
+                    theme_text_color="Hint",
+                    font_style="Label",
+                    role="small",
+                    size_hint_x=None,
+                    width="220dp",
+                    halign="center",
+                )
+            bar.add_widget(self._recent_hint)
             return
 
+        # Chips reutilizados por código: solo se crean para códigos nuevos
+        chips = self._chip_cache
+        for codigo in chips.keys() - self._recent_codes:
+            del chips[codigo]
+
         for nombre, codigo in self._recent_scans:
             texto = nombre[:14] + "…" if len(nombre) > 14 else nombre
-            chip = MDButton(
-                style="tonal",
-                size_hint=(None, None),
-                height="36dp",
-                width="130dp",
-                on_release=lambda x, c=codigo: self.on_code_scanned(c, "RECIENTE"),
-            )
-            chip.add_widget(MDButtonText(text=texto, font_size="11sp"))
+            if codigo in chips:
+                chip, chip_text = chips[codigo]
+                chip_text.text = texto
+            else:
+                chip = MDButton(
+                    style="tonal",
+                    size_hint=(None, None),
+                    height="36dp",
+                    width="130dp",
+                    on_release=lambda x, c=codigo: self.on_code_scanned(c, "RECIENTE"),
+                )
+                chip_text = MDButtonText(text=texto, font_size="11sp")
+                chip.add_widget(chip_text)
+                chips[codigo] = (chip, chip_text)
             bar.add_widget(chip)
 
     def _mostrar_snackbar(self, mensaje):
-        """Muestra mensaje snackbar."""
-        MDSnackbar(
-            MDSnackbarText(text=mensaje),
-            y="24dp",
-            pos_hint={"center_x": 0.5},
-            size_hint_x=0.9,
-        ).open()
+        """Muestra mensaje snackbar (instancia compartida, ver Notificador)."""
+        Notificador().mostrar(mensaje)
 
     def _mostrar_menu_usuario(self):
         """Muestra información del usuario actual."""
@@ -941,26 +1153,48 @@ class CameraScreen(MDScreen):
         if not self.camera_widget or not self.camera_widget.texture: return
         try:
             texture = self.camera_widget.texture
-            frame = self._texture_to_numpy(texture)
-            if 'status_label' in self.ids: self.ids.status_label.text = "✓ Foto capturada"
+            frame = self._texture_to_numpy(texture.pixels, texture.size, bgr=True)
+            self._set_status("✓ Foto capturada")
             print(f"✓ Foto OK: {frame.shape}")
         except Exception as e:
             print(f"✗ Error foto: {e}")
 
-    def _texture_to_numpy(self, texture):
-        """Convierte textura Kivy a numpy array (requiere cv2/numpy)."""
+    def _texture_to_numpy(self, pixels, size, bgr=False):
+        """
+        Convierte los pixeles RGBA de una textura Kivy a numpy array (requiere cv2/numpy).
+        Recibe pixels/size ya leídos: texture.pixels solo puede leerse en el hilo de Kivy.
+
+        Por defecto devuelve escala de grises (1 byte/pixel), que es el formato
+        que pyzbar procesa internamente; bgr=True devuelve BGR para fotos.
+        """
         if not PYZBAR_AVAILABLE:
             return None
-        size = texture.size
-        pixels = texture.pixels
-        arr = np.frombuffer(pixels, dtype=np.uint8)
-        arr = arr.reshape(size[1], size[0], 4)
-        return cv2.cvtColor(arr, cv2.COLOR_RGBA2BGR)
+        w, h = size
+        arr = _np_frombuffer(pixels, dtype=np.uint8).reshape(h, w, 4)  # Vista, sin copia
+        if bgr:
+            return _cv2_cvtColor(arr, _RGBA2BGR)
+
+        # Buffer de salida persistente (se recrea solo si cambia la resolución).
+        # El resultado se sobrescribe en el siguiente frame: solo para uso inmediato.
+        if self._gray_buf is None or self._gray_buf.shape != (h, w):
+            self._gray_buf = np.empty((h, w), dtype=np.uint8)
+        return _cv2_cvtColor(arr, _RGBA2GRAY, dst=self._gray_buf)
+
+    def _frame_for_decode(self, pixels, size):
+        """Frame en escala de grises reducido a DECODE_MAX_WIDTH de ancho para pyzbar."""
+        gray = self._texture_to_numpy(pixels, size)
+        h, w = gray.shape
+        if w > DECODE_MAX_WIDTH:
+            dsize = (DECODE_MAX_WIDTH, max(1, round(h * DECODE_MAX_WIDTH / w)))
+            if self._small_buf is None or self._small_buf.shape != (dsize[1], dsize[0]):
+                self._small_buf = np.empty((dsize[1], dsize[0]), dtype=np.uint8)
+            gray = _cv2_resize(gray, dsize, dst=self._small_buf, interpolation=_INTER_AREA)
+        return gray
 
     def _show_error_message(self, message):
-        if 'camera_container' in self.ids:
-            self.ids.camera_container.clear_widgets()
-            self.ids.camera_container.add_widget(MDLabel(text=message, halign="center", theme_text_color="Error"))
+        if self._camera_container:
+            self._camera_container.clear_widgets()
+            self._camera_container.add_widget(MDLabel(text=message, halign="center", theme_text_color="Error"))
 
     def _update_rotation_origin(self, *args):
         """Actualiza el origen de rotación cuando cambia el tamaño del widget."""
@@ -3,34 +3,205 @@
 Pantalla de Inventario con RecycleView para rendimiento óptimo.
 Diseño con imagen de producto estilo MDListItem.
 """
-from kivy.properties import ListProperty, BooleanProperty, StringProperty, NumericProperty
+import io
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from operator import itemgetter
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from kivy.properties import BooleanProperty, StringProperty, NumericProperty
 from kivy.clock import Clock
 from kivy.uix.recycleview.views import RecycleDataViewBehavior
 from kivy.metrics import dp
+from kivy.graphics.texture import Texture
+from kivy.core.image import Image as CoreImage
 from kivymd.uix.screen import MDScreen
-from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.label import MDLabel
 from kivymd.uix.fitimage import FitImage
 from kivymd.uix.card import MDCard
-from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
-from kivy.utils import platform
+from kivy.utils import platform, escape_markup
+
+from vista.components.notificador import Notificador
+
+try:
+    from PIL import Image as PILImage, UnidentifiedImageError
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    UnidentifiedImageError = ValueError
+
+# Colores del texto de ProductoItem (markup)
+COLOR_SECUNDARIO = "757575"
+COLOR_STOCK_BAJO = "E31C24"  # Rojo CORPOELEC
+
+# Caracteres que caben en una línea de ProductoItem en un teléfono (~250dp de texto).
+# Una línea de más desborda la fila de alto fijo (88dp).
+NOMBRE_MAX = 26   # Nombre en negrita 16sp
+INFO_MAX = 38     # Categoría | código (solo se recorta la categoría)
+
+# Trazas de navegación/carga (cada print cruza a logcat en Android); errores siempre se imprimen
+DEBUG_INVENTARIO = False
+
+# Segundos durante los que volver a la pantalla no recarga (si el cache no cambió)
+RECARGA_TTL = 30
+
+# Serializa la creación/conexión del repositorio entre hilos de carga: on_leave puede
+# liberar is_loading con un hilo aún corriendo, y el Singleton no es thread-safe
+_repositorio_lock = threading.Lock()
+
+# Días de anticipación para la alerta "por vencer" (SIAM-RF-05)
+DIAS_POR_VENCER = 30
+
+# Campos de producto que se muestran en ProductoItem
+CAMPOS_VISTA = (
+    'codigo_barras', 'nombre', 'categoria', 'cantidad', 'precio',
+    'stock_minimo', 'stock_maximo', 'imagen_url',
+)
+
+
+def _firma_vista(productos):
+    """Firma de lo que muestra la lista (detecta syncs sin cambios visibles)."""
+    return tuple(tuple(p.get(campo) for campo in CAMPOS_VISTA) for p in productos)
+
+
+def _recortar(texto, maximo):
+    """Recorta texto a una sola línea de la fila, terminando en '…'."""
+    return texto if len(texto) <= maximo else texto[:maximo - 1].rstrip() + "…"
+
+
+def _preparar_vista(productos):
+    """
+    Agrega a cada producto (in-place) los datos ya formateados para ProductoItem:
+    '_texto' (markup de las tres líneas), '_low', '_img'. Se hace una vez al asignar
+    la lista, no en cada refresh_view_attrs durante el scroll.
+
+    En la misma pasada cuenta las alertas (mismos criterios que CacheLocal) e interna
+    'categoria' y 'codigo_barras': cada categoría queda como un único objeto str
+    compartido por todos sus productos.
+
+    Returns:
+        (stock_bajo, por_vencer): cantidad de productos en cada alerta
+    """
+    fecha_limite = (datetime.now() + timedelta(days=DIAS_POR_VENCER)).isoformat()[:10]
+    total_stock_bajo = 0
+    total_por_vencer = 0
+    for p in productos:
+        categoria = p.get('categoria')
+        if type(categoria) is str:
+            p['categoria'] = sys.intern(categoria)
+        codigo = p.get('codigo_barras')
+        if type(codigo) is str:
+            p['codigo_barras'] = sys.intern(codigo)
+
+        cantidad = p.get('cantidad', 0)
+        stock_maximo = p.get('stock_maximo', 0)
+        stock_minimo = p.get('stock_minimo', 0)
+        precio = p.get('precio', 0)
+
+        # Stock bajo (SIAM-RF-02)
+        stock_bajo = ((stock_maximo > 0 and cantidad <= stock_maximo * 0.15)
+                      or (stock_minimo > 0 and cantidad <= stock_minimo))
+
+        stock = f"Stock: {cantidad} | ${precio:.2f}" if precio > 0 else f"Stock: {cantidad}"
+        if stock_bajo:
+            stock = f"[color={COLOR_STOCK_BAJO}]{stock}  BAJO[/color]"
+
+        nombre = escape_markup(_recortar(p.get('nombre', 'Sin nombre'), NOMBRE_MAX))
+        # El código de barras identifica la fila: se muestra completo
+        codigo = str(p.get('codigo_barras', ''))
+        categoria = _recortar(str(p.get('categoria', 'General')), max(INFO_MAX - len(codigo) - 3, 4))
+        info = escape_markup(f"{categoria} | {codigo}")
+        p['_texto'] = (f"[b][size=16sp]{nombre}[/size][/b]\n"
+                       f"[color={COLOR_SECUNDARIO}]{info}[/color]\n{stock}")
+        p['_low'] = stock_bajo
+        p['_img'] = p.get('imagen_url', '')
+
+        if stock_bajo:
+            total_stock_bajo += 1
+        vencimiento = p.get('fecha_vencimiento')
+        if vencimiento and vencimiento <= fecha_limite:
+            total_por_vencer += 1
+    return total_stock_bajo, total_por_vencer
+
+
+# ─────────────────────────────────────────────────────────
+# MINIATURAS DE PRODUCTO
+# Descarga + decodificación en hilos; la textura se crea en el hilo de Kivy.
+# ─────────────────────────────────────────────────────────
+
+MINIATURA_LADO = int(dp(64))   # Lado máximo (px) de la miniatura: tamaño de ProductoItem.imagen
+MINIATURAS_MAX = 100           # Texturas retenidas en el cache LRU
+PLACEHOLDER_PATH = "assets/placeholder.png"
+
+_img_executor = ThreadPoolExecutor(max_workers=4)
+_miniaturas = OrderedDict()    # url -> Texture (LRU)
+_miniaturas_pendientes = {}    # url -> Future en curso (una descarga por URL)
+_miniaturas_fallidas = set()   # URLs con fallo permanente (no se reintentan hasta refrescar/sync)
+
+
+def _decodificar_miniatura(url):
+    """Descarga/abre la imagen y la reduce a miniatura RGBA (se ejecuta en el pool)."""
+    if url.startswith(('http://', 'https://')):
+        from modelo.firebase_client import _ssl_context
+        origen = io.BytesIO(urlopen(url, timeout=10, context=_ssl_context).read())
+    else:
+        origen = url
+    with PILImage.open(origen) as img:
+        img.draft('RGB', (MINIATURA_LADO, MINIATURA_LADO))  # JPEG: decodifica ya reducido
+        img.thumbnail((MINIATURA_LADO, MINIATURA_LADO))
+        img = img.convert('RGBA')
+        return img.size, img.tobytes()
+
+
+def _es_fallo_permanente(error):
+    """
+    True si reintentar la URL no sirve: imagen corrupta/no soportada, archivo local
+    inexistente o HTTP 4xx. Timeouts y falta de red (app offline-first) se reintentan.
+    """
+    if isinstance(error, HTTPError):
+        return 400 <= error.code < 500
+    if isinstance(error, (UnidentifiedImageError, FileNotFoundError)):
+        return True
+    return not isinstance(error, OSError)
+
+
+def _textura_miniatura(url, size, pixels):
+    """Crea la textura (hilo de Kivy) y la guarda en el cache LRU."""
+    textura = Texture.create(size=size, colorfmt='rgba')
+    textura.blit_buffer(pixels, colorfmt='rgba', bufferfmt='ubyte')
+    textura.flip_vertical()
+    _miniaturas[url] = textura
+    if len(_miniaturas) > MINIATURAS_MAX:
+        _miniaturas.popitem(last=False)
+    return textura
 
 
 class ProductoItem(RecycleDataViewBehavior, MDCard):
     """Item de producto para RecycleView con diseño de tarjeta."""
     index = NumericProperty(0)
 
+    _PLACEHOLDER_TEX = None  # Textura compartida por todas las filas sin imagen
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.orientation = "horizontal"
-        self.size_hint_y = None
-        self.height = dp(88)
+        # Alto fijo: lo asigna el RecycleBoxLayout (default_size en mobile.kv)
         self.padding = dp(8)
         self.spacing = dp(12)
         self.radius = [dp(8)]
         self.elevation = 0
         self.md_bg_color = (1, 1, 1, 1)
         self.ripple_behavior = True
+        self._imagen_url = None  # URL que debe mostrar esta vista (cambia al reciclarla)
+        self._screen_ref = None  # weakref al InventoryScreen dueño del RecycleView
+        self._data = None        # Producto mostrado actualmente
 
         # Imagen del producto
         self.imagen = FitImage(
@@ -41,105 +212,101 @@ class ProductoItem(RecycleDataViewBehavior, MDCard):
         )
         self.add_widget(self.imagen)
 
-        # Contenedor de texto
-        text_box = MDBoxLayout(
-            orientation="vertical",
-            spacing=dp(2),
-            padding=(0, dp(4), 0, dp(4)),
-        )
-
-        self.nombre_label = MDLabel(
-            text="",
-            font_style="Title",
-            role="medium",
-            adaptive_height=True,
-            shorten=True,
-            shorten_from="right",
-        )
-        self.info_label = MDLabel(
+        # Nombre, info y stock en un solo label con markup (menos widgets por fila)
+        self.texto_label = MDLabel(
             text="",
+            markup=True,
             font_style="Body",
             role="small",
-            theme_text_color="Secondary",
-            adaptive_height=True,
-        )
-        self.stock_label = MDLabel(
-            text="",
-            font_style="Label",
-            role="medium",
             theme_text_color="Primary",
-            adaptive_height=True,
+            valign="center",
         )
-
-        text_box.add_widget(self.nombre_label)
-        text_box.add_widget(self.info_label)
-        text_box.add_widget(self.stock_label)
-        self.add_widget(text_box)
+        self.add_widget(self.texto_label)
 
     def refresh_view_attrs(self, rv, index, data):
-        """Actualiza el item con nuevos datos."""
+        """
+        Actualiza el item con nuevos datos.
+        Los textos vienen preformateados por _preparar_vista; no se llama a super()
+        porque solo copiaría cada clave de data como atributo del widget.
+        """
         self.index = index
+        self._screen_ref = rv.screen_ref
+        self._data = data
+        # Incluye la alerta visual de stock bajo (SIAM-RF-02) como color en el markup
+        self.texto_label.text = data['_texto']
+        self._cargar_imagen(data['_img'])
+
+    def _cargar_imagen(self, url):
+        """
+        Muestra la miniatura de url sin bloquear el scroll:
+        cache LRU → textura inmediata; si no, placeholder y decodificación en el pool.
+        """
+        self._imagen_url = url
+        if url and not PIL_AVAILABLE:
+            self.imagen.source = url
+            return
+        if not url or url in _miniaturas_fallidas:
+            self._mostrar_textura(self._placeholder())
+            return
 
-        # Nombre
-        self.nombre_label.text = data.get('nombre', 'Sin nombre')[:45]
-
-        # Info
-        categoria = data.get('categoria', 'General')
-        codigo = data.get('codigo_barras', '')
-        self.info_label.text = f"{categoria} | {codigo}"
-
-        # Stock con alerta visual (SIAM-RF-02)
-        cantidad = data.get('cantidad', 0)
-        stock_maximo = data.get('stock_maximo', 0)
-        stock_minimo = data.get('stock_minimo', 0)
-        precio = data.get('precio', 0)
-
-        # Determinar si stock está bajo
-        stock_bajo = False
-        if stock_maximo > 0 and cantidad <= stock_maximo * 0.15:
-            stock_bajo = True
-        elif stock_minimo > 0 and cantidad <= stock_minimo:
-            stock_bajo = True
-
-        if precio > 0:
-            self.stock_label.text = f"Stock: {cantidad} | ${precio:.2f}"
-        else:
-            self.stock_label.text = f"Stock: {cantidad}"
-
-        if stock_bajo:
-            self.stock_label.text += "  BAJO"
-            self.stock_label.theme_text_color = "Custom"
-            self.stock_label.text_color = (0.89, 0.11, 0.14, 1)  # Rojo CORPOELEC
-        else:
-            self.stock_label.theme_text_color = "Primary"
+        textura = _miniaturas.get(url)
+        if textura is not None:
+            _miniaturas.move_to_end(url)
+            self._mostrar_textura(textura)
+            return
 
-        # Imagen
-        imagen_url = data.get('imagen_url', '')
-        if imagen_url:
-            self.imagen.source = imagen_url
-        else:
-            self.imagen.source = "assets/placeholder.png"
+        self._mostrar_textura(self._placeholder())
+        future = _miniaturas_pendientes.get(url)
+        if future is None:
+            future = _img_executor.submit(_decodificar_miniatura, url)
+            _miniaturas_pendientes[url] = future
+        future.add_done_callback(
+            lambda f: Clock.schedule_once(lambda dt: self._on_miniatura(url, f))
+        )
 
-        return super().refresh_view_attrs(rv, index, data)
+    def _on_miniatura(self, url, future):
+        """Recibe la miniatura decodificada (hilo de Kivy)."""
+        _miniaturas_pendientes.pop(url, None)
+        textura = _miniaturas.get(url)
+        if textura is None:
+            if url in _miniaturas_fallidas:
+                return
+            try:
+                size, pixels = future.result()
+            except Exception as e:
+                if _es_fallo_permanente(e):
+                    _miniaturas_fallidas.add(url)
+                print(f"⚠ Imagen no disponible ({url}): {e}")
+                return
+            textura = _textura_miniatura(url, size, pixels)
+
+        # La vista pudo reciclarse para otro producto mientras se descargaba
+        if self._imagen_url == url:
+            self._mostrar_textura(textura)
+
+    def _mostrar_textura(self, textura):
+        """Asigna una textura ya cargada a la imagen (sin pasar por source/disco)."""
+        self.imagen.source = ""
+        self.imagen.texture = textura
+
+    @classmethod
+    def _placeholder(cls):
+        """Textura placeholder, cargada una sola vez (gris plano si no existe el archivo)."""
+        if cls._PLACEHOLDER_TEX is None:
+            if os.path.exists(PLACEHOLDER_PATH):
+                cls._PLACEHOLDER_TEX = CoreImage(PLACEHOLDER_PATH).texture
+            else:
+                textura = Texture.create(size=(1, 1), colorfmt='rgba')
+                textura.blit_buffer(bytes((224, 224, 224, 255)), colorfmt='rgba', bufferfmt='ubyte')
+                cls._PLACEHOLDER_TEX = textura
+        return cls._PLACEHOLDER_TEX
 
     def on_touch_down(self, touch):
         """Maneja click en el item."""
         if self.collide_point(*touch.pos):
-            # Navegar hacia arriba para encontrar el screen
-            parent = self.parent
-            while parent:
-                if hasattr(parent, '_on_producto_click'):
-                    if hasattr(parent, 'parent') and hasattr(parent.parent, 'data'):
-                        rv = parent.parent
-                        if self.index < len(rv.data):
-                            parent._on_producto_click(rv.data[self.index])
-                    break
-                if isinstance(parent, InventoryScreen):
-                    rv_widget = parent.ids.get('product_rv')
-                    if rv_widget and self.index < len(rv_widget.data):
-                        parent._on_producto_click(rv_widget.data[self.index])
-                    break
-                parent = parent.parent
+            screen = self._screen_ref() if self._screen_ref else None
+            if screen is not None and self._data is not None:
+                screen._on_producto_click(self._data)
             return True
         return super().on_touch_down(touch)
 
@@ -150,7 +317,7 @@ class InventoryScreen(MDScreen):
     Renderiza solo items visibles para máximo rendimiento.
     """
 
-    productos = ListProperty([])
+    sin_productos = BooleanProperty(True)  # Estado vacío en el .kv (productos es atributo plano)
     is_loading = BooleanProperty(False)
     error_message = StringProperty("")
     is_offline = BooleanProperty(False)
@@ -159,37 +326,84 @@ class InventoryScreen(MDScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.repository = None
+        # Lista plana (no ListProperty): asignarla no copia a ObservableList ni despacha eventos;
+        # el RecycleView se actualiza explícitamente en _actualizar_recycleview
+        self.productos = []
+        self._sync_token = 0  # Se incrementa en on_leave para descartar syncs en vuelo
+        self._firma_rv = None  # Firma de los datos mostrados actualmente en el RecycleView
+        self._firma_productos = None  # Firma (sin orden) del contenido de self.productos
+        self._product_rv = None  # Referencia a ids.product_rv (ver _get_rv)
+        self._alertas = (0, 0)  # (stock_bajo, por_vencer) calculados por _preparar_vista
+        self._last_load = 0.0         # time.monotonic() de la última carga mostrada
+        self._version_cargada = None  # repository.version de esa carga
 
     def on_enter(self, *args):
         """Carga productos cuando entra a la pantalla."""
-        print(f"✓ Entrando a InventoryScreen: {self.name}")
+        if DEBUG_INVENTARIO:
+            print(f"✓ Entrando a InventoryScreen: {self.name}")
+        # Volver a una lista reciente sin escrituras desde entonces: no recargar
+        if (self.productos and self.repository is not None
+                and self._version_cargada == self.repository.version
+                and time.monotonic() - self._last_load < RECARGA_TTL):
+            return
         self.cargar_productos()
 
     def on_leave(self, *args):
         """Callback cuando sale de la pantalla."""
-        print(f"✓ Saliendo de InventoryScreen: {self.name}")
+        if DEBUG_INVENTARIO:
+            print(f"✓ Saliendo de InventoryScreen: {self.name}")
+        # Cancelar sync en vuelo: su respuesta ya no debe tocar la UI
+        self._sync_token += 1
+        self.is_loading = False
 
-    def cargar_productos(self):
-        """Carga productos desde cache local y/o Firebase."""
+    def cargar_productos(self, forzar=False):
+        """
+        Carga productos desde cache local y/o Firebase.
+
+        Con cache disponible, Firebase solo se consulta si el último sync
+        tiene más de ProductoRepository.SYNC_TTL segundos (o si forzar=True).
+
+        La conexión y la lectura SQLite corren en un hilo para no congelar
+        la navegación; el resultado vuelve al hilo de Kivy con Clock.
+        """
         if self.is_loading:
             return
 
         self.is_loading = True
         self.error_message = ""
 
-        # Inicializar Repository si no existe
-        if self.repository is None:
-            from modelo.repository import ProductoRepository
-            self.repository = ProductoRepository()
-            self.repository.conectar()
+        token = self._sync_token
+        threading.Thread(target=self._leer_cache, args=(token, forzar), daemon=True).start()
+
+    def _leer_cache(self, token, forzar):
+        """Inicializa el repositorio y lee el cache (hilo secundario: no tocar widgets)."""
+        try:
+            # Inicializar Repository si no existe (un solo hilo a la vez)
+            if self.repository is None:
+                with _repositorio_lock:
+                    if self.repository is None:
+                        from modelo.repository import ProductoRepository
+                        repository = ProductoRepository()
+                        repository.conectar()
+                        self.repository = repository
+
+            productos_cache = self.repository.get_todos()
+        except Exception as e:
+            Clock.schedule_once(lambda dt, error=e: self._on_error_carga(error, token))
+            return
+        Clock.schedule_once(lambda dt: self._on_cache_leido(productos_cache, token, forzar))
+
+    def _on_cache_leido(self, productos_cache, token, forzar):
+        """Recibe el cache leído en _leer_cache (hilo de Kivy)."""
+        if token != self._sync_token:
+            return  # Se salió de la pantalla mientras se leía el cache
 
-        # Cargar desde cache (inmediato, funciona offline)
+        # Cargar desde cache (funciona offline)
         self.is_offline = not self.repository.is_online
-        productos_cache = self.repository.get_todos()
 
         if productos_cache:
             self._on_productos_cargados(productos_cache)
-            if self.repository.is_online:
+            if self.repository.is_online and (forzar or not self.repository.sync_reciente()):
                 self._sync_desde_firebase()
         elif self.repository.is_online:
             self._sync_desde_firebase()
@@ -202,9 +416,10 @@ class InventoryScreen(MDScreen):
         if not self.repository.firebase:
             return
 
+        token = self._sync_token
         self.repository.firebase.get_todos_productos_async(
-            on_success=self._on_firebase_sync,
-            on_error=self._on_error_carga
+            on_success=lambda productos: self._on_firebase_sync(productos, token),
+            on_error=lambda error: self._on_error_carga(error, token)
         )
 
     def _on_productos_cargados(self, productos):
@@ -212,32 +427,51 @@ class InventoryScreen(MDScreen):
         self.is_loading = False
         # Productos ya vienen ordenados por stock desde cache_local
         self.productos = productos or []
-        modo = "offline" if self.is_offline else "online"
-        print(f"✓ Cargados {len(self.productos)} productos ({modo})")
-        Clock.schedule_once(lambda dt: self._actualizar_recycleview())
+        self.sin_productos = not self.productos
+        self._alertas = _preparar_vista(self.productos)
+        self._last_load = time.monotonic()
+        self._version_cargada = self.repository.version
+        self._firma_productos = frozenset(_firma_vista(self.productos))
+        if DEBUG_INVENTARIO:
+            modo = "offline" if self.is_offline else "online"
+            print(f"✓ Cargados {len(self.productos)} productos ({modo})")
+        self._actualizar_recycleview()
 
         # SIAM-RF-02: Verificar alertas de stock bajo
-        Clock.schedule_once(lambda dt: self._verificar_alertas(), 0.5)
+        self._verificar_alertas()
 
-    def _on_firebase_sync(self, productos):
+    def _on_firebase_sync(self, productos, token):
         """Callback cuando llegan datos de Firebase."""
         if productos:
-            self.repository.cache.sincronizar_desde_firebase(productos)
+            self.repository.guardar_sync(productos)
+        if token != self._sync_token:
+            return  # Sync cancelado en on_leave: cache ya actualizado, la UI recarga en on_enter
+
+        if productos:
             self.is_offline = False
-            print(f"✓ Sincronizados {len(productos)} productos desde Firebase")
-            # Siempre actualizar UI con datos frescos de Firebase
-            # Ordenar por stock descendente
-            productos_ordenados = sorted(
-                productos,
-                key=lambda p: p.get('cantidad', 0),
-                reverse=True
-            )
-            self.productos = productos_ordenados
-            Clock.schedule_once(lambda dt: self._actualizar_recycleview())
+            _miniaturas_fallidas.clear()  # Las URLs pueden haber cambiado en Firebase
+            if DEBUG_INVENTARIO:
+                print(f"✓ Sincronizados {len(productos)} productos desde Firebase")
+            # Actualizar UI solo si el contenido cambió (sync suele coincidir con el cache).
+            # Se compara contenido, no longitud: cambios de stock/precio también cuentan.
+            firma = frozenset(_firma_vista(productos))
+            if firma != self._firma_productos:
+                # Ordenar por stock descendente (in-place; 'cantidad' viene de _firestore_to_dict)
+                productos.sort(key=itemgetter('cantidad'), reverse=True)
+                self.productos = productos
+                self.sin_productos = False
+                self._alertas = _preparar_vista(productos)
+                self._firma_productos = firma
+                self._actualizar_recycleview()
+            # La lista mostrada ya refleja lo que este sync escribió en el cache
+            self._last_load = time.monotonic()
+            self._version_cargada = self.repository.version
         self.is_loading = False
 
-    def _on_error_carga(self, error):
+    def _on_error_carga(self, error, token):
         """Callback cuando hay error de carga."""
+        if token != self._sync_token:
+            return
         self.is_loading = False
         if self.productos:
             print(f"⚠ Error sync Firebase (usando cache): {error}")
@@ -246,74 +480,86 @@ class InventoryScreen(MDScreen):
             self.error_message = str(error)
             print(f"✗ Error cargando productos: {error}")
 
+    def _get_rv(self):
+        """RecycleView de productos; se resuelve en ids una sola vez."""
+        if self._product_rv is None:
+            self._product_rv = self.ids.get('product_rv')
+            if self._product_rv is not None:
+                # Los ProductoItem la toman en refresh_view_attrs para despachar clicks
+                self._product_rv.screen_ref = weakref.ref(self)
+        return self._product_rv
+
     def _actualizar_recycleview(self):
         """Actualiza el RecycleView con los productos."""
-        rv = self.ids.get('product_rv')
+        rv = self._get_rv()
         if rv:
-            rv.data = self.productos
-            print(f"✓ RecycleView actualizado: {len(self.productos)} items")
+            # Mismo contenido visible (p.ej. sync idéntico al cache): evitar re-layout
+            firma = _firma_vista(self.productos)
+            if firma == self._firma_rv:
+                return
+            self._firma_rv = firma
+
+            productos = self.productos
+            data = rv.data
+            if len(data) == len(productos) and all(
+                    a.get('codigo_barras') == b.get('codigo_barras') for a, b in zip(data, productos)):
+                # Mismos productos en el mismo orden (p.ej. cambió un stock): reemplazar solo
+                # las filas cambiadas; el RecycleView refresca únicamente esos índices
+                for i, p in enumerate(productos):
+                    if data[i] != p:
+                        data[i] = p
+            else:
+                rv.data = productos
+            if DEBUG_INVENTARIO:
+                print(f"✓ RecycleView actualizado: {len(productos)} items")
+
+    def _notify(self, mensaje):
+        """Muestra mensaje en el snackbar compartido (ver Notificador)."""
+        Notificador().mostrar(mensaje)
 
     def _on_producto_click(self, producto):
         """Maneja click en un producto."""
-        print(f"✓ Producto seleccionado: {producto.get('nombre')}")
+        if DEBUG_INVENTARIO:
+            print(f"✓ Producto seleccionado: {producto.get('nombre')}")
         # TODO: Mostrar detalle o diálogo de edición
 
     def _verificar_alertas(self):
-        """Verifica alertas de stock bajo y vencimiento (SIAM-RF-02)."""
-        if not self.repository:
-            return
-
-        alertas = self.repository.get_todas_alertas()
-        stock_bajo = alertas.get('stock_bajo', [])
-        por_vencer = alertas.get('por_vencer', [])
+        """
+        Verifica alertas de stock bajo y vencimiento (SIAM-RF-02).
+        Usa los conteos de _preparar_vista: no vuelve a consultar el cache.
+        """
+        stock_bajo, por_vencer = self._alertas
 
-        total = len(stock_bajo) + len(por_vencer)
+        total = stock_bajo + por_vencer
         if total > 0:
             partes = []
             if stock_bajo:
-                partes.append(f"{len(stock_bajo)} con stock bajo")
+                partes.append(f"{stock_bajo} con stock bajo")
             if por_vencer:
-                partes.append(f"{len(por_vencer)} por vencer")
+                partes.append(f"{por_vencer} por vencer")
             mensaje = "Alertas: " + ", ".join(partes)
-            MDSnackbar(
-                MDSnackbarText(text=mensaje),
-                y="24dp",
-                pos_hint={"center_x": 0.5},
-                size_hint_x=0.9,
-            ).open()
+            self._notify(mensaje)
             print(f"⚠ {mensaje}")
 
     def generar_reporte(self):
         """Genera reporte PDF del inventario (SIAM-RF-04)."""
         # Reportes no disponibles en Android (reportlab no compatible)
         if platform == "android":
-            MDSnackbar(
-                MDSnackbarText(text="Reportes no disponibles en móvil"),
-                y="24dp", pos_hint={"center_x": 0.5}, size_hint_x=0.9,
-            ).open()
+            self._notify("Reportes no disponibles en móvil")
             return
 
         try:
             from modelo.reportes import generar_reporte_inventario, REPORTLAB_AVAILABLE
         except ImportError:
-            MDSnackbar(
-                MDSnackbarText(text="Modulo de reportes no disponible"),
-                y="24dp", pos_hint={"center_x": 0.5}, size_hint_x=0.9,
-            ).open()
+            self._notify("Modulo de reportes no disponible")
             return
 
         if not REPORTLAB_AVAILABLE:
-            MDSnackbar(
-                MDSnackbarText(text="reportlab no instalado"),
-                y="24dp", pos_hint={"center_x": 0.5}, size_hint_x=0.9,
-            ).open()
+            self._notify("reportlab no instalado")
             return
 
         if not self.productos:
-            MDSnackbar(
-                MDSnackbarText(text="No hay productos para reportar"),
-                y="24dp", pos_hint={"center_x": 0.5}, size_hint_x=0.9,
-            ).open()
+            self._notify("No hay productos para reportar")
             return
 
         try:
@@ -321,17 +567,12 @@ class InventoryScreen(MDScreen):
             app = App.get_running_app()
             usuario = getattr(app, 'current_user', None) or ""
             ruta = generar_reporte_inventario(self.productos, usuario)
-            MDSnackbar(
-                MDSnackbarText(text=f"Reporte generado: {ruta}"),
-                y="24dp", pos_hint={"center_x": 0.5}, size_hint_x=0.9,
-            ).open()
+            self._notify(f"Reporte generado: {ruta}")
         except Exception as e:
             print(f"✗ Error generando reporte: {e}")
-            MDSnackbar(
-                MDSnackbarText(text=f"Error: {e}"),
-                y="24dp", pos_hint={"center_x": 0.5}, size_hint_x=0.9,
-            ).open()
+            self._notify(f"Error: {e}")
 
     def refrescar(self):
-        """Refresca la lista de productos."""
-        self.cargar_productos()
+        """Refresca la lista de productos (ignora el TTL de sync)."""
+        _miniaturas_fallidas.clear()
+        self.cargar_productos(forzar=True)
@@ -4,10 +4,37 @@ Pantalla de inicio de sesión para SIAM.
 Implementa autenticación de usuarios con validación.
 """
 
+import hashlib
+import hmac
+import threading
+
 from kivy.clock import Clock
 from kivymd.uix.screen import MDScreen
 from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
 
+# Iteraciones PBKDF2-SHA256 (~40 ms en desktop, más en móvil: se calcula fuera del hilo de Kivy)
+PBKDF2_ITERACIONES = 120_000
+
+# Usuarios de prueba para desarrollo: usuario -> (salt hex, hash PBKDF2 hex).
+# Solo se guarda el hash; la contraseña de prueba no está en el código.
+_USUARIOS_PRUEBA = {
+    "admin": ("9579e8fe61cd37a33f123360ba1dacdd",
+              "ccd3cd282b4001147ce1fd8cc40b41904f4cbd6ded38fabacd0ce80678a13c54"),
+    "almacen": ("a2933a277cf8fe9711c3b1ffba71b3dc",
+                "fa7c4f5567b4d77773f5a6a61f5d59486075f1b5cd4e258018170e898395e051"),
+    "cocina": ("93b941c831f63ee05529e83920e2fb7d",
+               "fec3f11fb6d8c6ec3831ba794828d0468ca70bfe8d8aadecc410a0362b29f895"),
+}
+
+# Usado para usuarios inexistentes: el tiempo de respuesta no revela si el usuario existe
+_SALT_FICTICIO = "00000000000000000000000000000000"
+
+
+def _hash_password(password: str, salt_hex: str) -> bytes:
+    """Hash PBKDF2-SHA256 de la contraseña."""
+    return hashlib.pbkdf2_hmac('sha256', password.encode(), bytes.fromhex(salt_hex),
+                               PBKDF2_ITERACIONES)
+
 
 class LoginScreen(MDScreen):
     """
@@ -23,6 +50,7 @@ class LoginScreen(MDScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = "login"
+        self._auth_en_curso = False  # Evita lanzar dos autenticaciones a la vez
 
     def on_enter(self, *args):
         """Se ejecuta al entrar a la pantalla. Verifica si hay sesión activa."""
@@ -81,8 +109,9 @@ class LoginScreen(MDScreen):
     def attempt_login(self):
         """
         Intenta iniciar sesión con las credenciales proporcionadas.
+        La verificación (hash costoso) corre en un hilo; el resultado vuelve con Clock.
         """
-        if not self.validate_login():
+        if self._auth_en_curso or not self.validate_login():
             return
 
         username = self.ids.username_field.text.strip()
@@ -90,26 +119,39 @@ class LoginScreen(MDScreen):
 
         print(f"✓ Intentando login: {username}")
 
-        # TODO: Integrar con modelo de autenticación real
-        # Por ahora, credenciales de prueba
-        if self._authenticate(username, password):
+        self._auth_en_curso = True
+        threading.Thread(
+            target=self._autenticar_en_hilo, args=(username, password), daemon=True
+        ).start()
+
+    def _autenticar_en_hilo(self, username: str, password: str):
+        """Ejecuta _authenticate fuera del hilo de Kivy."""
+        try:
+            ok = self._authenticate(username, password)
+        except Exception as e:
+            print(f"✗ Error autenticando: {e}")
+            ok = False
+        Clock.schedule_once(lambda dt: self._on_auth_resultado(username, ok))
+
+    def _on_auth_resultado(self, username: str, ok: bool):
+        """Recibe el resultado de la autenticación (hilo de Kivy)."""
+        self._auth_en_curso = False
+        if ok:
             self._on_login_success(username)
         else:
             self._show_error("Usuario o contraseña incorrectos")
 
     def _authenticate(self, username: str, password: str) -> bool:
         """
-        Autentica al usuario contra el modelo.
+        Autentica al usuario contra el modelo (compara hashes, no texto plano).
 
         TODO: Reemplazar con autenticación real (Active Directory - SIAM-RC-04)
         """
-        # Usuarios de prueba para desarrollo
-        test_users = {
-            "admin": "1234",
-            "almacen": "1234",
-            "cocina": "1234",
-        }
-        return test_users.get(username) == password
+        # TODO: Integrar con modelo de autenticación real
+        # Por ahora, credenciales de prueba
+        salt_hex, hash_hex = _USUARIOS_PRUEBA.get(username, (_SALT_FICTICIO, ""))
+        calculado = _hash_password(password, salt_hex)
+        return bool(hash_hex) and hmac.compare_digest(calculado, bytes.fromhex(hash_hex))
 
     def _on_login_success(self, username: str, save: bool = True):
         """